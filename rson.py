@@ -12,8 +12,13 @@ see spec/rson/md
 import re
 import io
 import base64
+import functools
+import operator
 import sys
 
+from binascii import a2b_base64, b2a_base64
+from types import MappingProxyType
+
 if sys.version_info.minor > 6 or sys.version_info.minor == 6 and sys.implementation.name == 'cpython':
     OrderedDict = dict
     from collections import namedtuple
@@ -32,27 +37,47 @@ reserved_tags = set("""
         unknown
 """.split())
 
-whitespace = re.compile(r"(?:\ |\t|\uFEFF|\r|\n|#[^\r\n]*(?:\r?\n|$))+")
-
-int_b2 = re.compile(r"0b[01][01_]*")
-int_b8 = re.compile(r"0o[0-7][0-7_]*")
-int_b10 = re.compile(r"\d[\d_]*")
-int_b16 = re.compile(r"0x[0-9a-fA-F][0-9a-fA-F_]*")
-
-flt_b10 = re.compile(r"\.[\d_]+")
-exp_b10 = re.compile(r"[eE](?:\+|-)?[\d+_]")
+# tags allowed on each kind of value, including no tag at all; one
+# frozenset probe replaces a tuple scan plus a reserved_tags lookup
+object_tags = frozenset({None, 'object', 'record', 'dict'})
+list_tags = frozenset({None, 'object', 'list', 'set', 'complex', 'string'})
+string_tags = frozenset({None, 'object', 'string', 'float', 'datetime', 'bytestring', 'base64'})
+number_tags = frozenset({None, 'object', 'int', 'float', 'duration'})
+
+# every numeric literal in one alternation: lastgroup names the radix
+# (or the decimal part) that matched, frac/exp flag a float
+number = re.compile(
+    r"0b(?P<bin>[01][01_]*)"
+    r"|0o(?P<oct>[0-7][0-7_]*)"
+    r"|0x(?P<hex>[0-9a-fA-F][0-9a-fA-F_]*)"
+    r"|(?P<dec>\d[\d_]*)(?P<frac>\.[\d_]+)?(?P<exp>[eE](?:\+|-)?\d[\d_]*)?")
+
+# literal control characters and surrogates are never allowed inside
+# strings, whatever the quoting
+bad_string_char = re.compile(r'[\x00-\x1F\uD800-\uDFFF]')
 
-string_dq = re.compile(
-    r'"(?:[^"\\\n\x00-\x1F\uD800-\uDFFF]|\\(?:[\'"\\/bfnrt]|\r?\n|x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}))*"')
-string_sq = re.compile(
-    r"'(?:[^'\\\n\x00-\x1F\uD800-\uDFFF]|\\(?:[\"'\\/bfnrt]|\r?\n|x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}))*'")
-
-tag_name = re.compile(r"@(?!\d)\w+[ ]+")
 identifier = re.compile(r"(?!\d)[\w\.]+")
 
 c99_flt = re.compile(
     r"NaN|nan|[-+]?Inf|[-+]?inf|[-+]?0x[0-9a-fA-F][0-9a-fA-F]*\.[0-9a-fA-F]+[pP](?:\+|-)?[\d]+")
 
+# bound .match methods; saves an attribute lookup per call in the
+# hot parsing paths
+bad_char_search = bad_string_char.search
+hex2_match = re.compile(r'[0-9a-fA-F]{2}').match
+hex4_match = re.compile(r'[0-9a-fA-F]{4}').match
+hex8_match = re.compile(r'[0-9a-fA-F]{8}').match
+num_match = number.match
+ident_match = identifier.match
+c99_match = c99_flt.match
+
+radix_group = {'bin': 2, 'oct': 8, 'hex': 16}
+radix_err = {
+    'x': "Invalid hexadecimal number (0x...)",
+    'o': "Invalid octal number (0o...)",
+    'b': "Invalid binary number (0b...)",
+}
+
 str_escapes = {
     'b': '\b',
     'n': '\n',
@@ -88,24 +113,122 @@ escaped = {
     '\\': '\\\\',
 }
 
+# str.translate table: same escapes as above plus \xHH for the
+# remaining control codes, applied in one C-level pass when dumping
+escape_table = {ord(c): esc for c, esc in escaped.items()}
+for i in range(0x20):
+    escape_table.setdefault(i, '\\x{:02X}'.format(i))
+
+_getkey = operator.itemgetter(0)
+
 builtin_names = {'null': None, 'true': True, 'false': False}
 builtin_values = {None: 'null', True: 'true', False: 'false'}
 
 # names -> Classes (take name, value as args)
-def parse_datetime(v):
-    if v[-1] == 'Z':
-        if '.' in v:
-            return datetime.strptime(v, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+if sys.version_info >= (3, 11):
+    def parse_datetime(v):
+        # fromisoformat is implemented in C and understands the
+        # trailing Z on 3.11+; keep the shape checks so the accepted
+        # grammar stays (close to) the same across versions
+        if v[-1] != 'Z':
+            raise NotImplementedError()
+        if v[4] != '-' or v[7] != '-' or v[10] != 'T' or v[13] != ':' or v[16] != ':':
+            raise ValueError('invalid datetime: {}'.format(v))
+        return datetime.fromisoformat(v)
+else:
+    def parse_datetime(v):
+        # fixed-width iso-8601, parsed by slicing: strptime re-reads the
+        # format string on every call and is ~10x slower
+        if v[-1] != 'Z':
+            raise NotImplementedError()
+        if v[4] != '-' or v[7] != '-' or v[10] != 'T' or v[13] != ':' or v[16] != ':':
+            raise ValueError('invalid datetime: {}'.format(v))
+        if len(v) > 20:
+            if v[19] != '.':
+                raise ValueError('invalid datetime: {}'.format(v))
+            frac = v[20:-1]
+            if not (1 <= len(frac) <= 6) or not frac.isdigit():
+                raise ValueError('invalid datetime: {}'.format(v))
+            microsecond = int((frac + '000000')[:6])
+        elif len(v) == 20:
+            microsecond = 0
         else:
-            return datetime.strptime(v, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
-    else:
-        raise NotImplementedError()
+            raise ValueError('invalid datetime: {}'.format(v))
+        return datetime(
+            int(v[0:4]), int(v[5:7]), int(v[8:10]),
+            int(v[11:13]), int(v[14:16]), int(v[17:19]),
+            microsecond, timezone.utc)
 
 
 def format_datetime(obj):
     obj = obj.astimezone(timezone.utc)
     return obj.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
 
+def skip_whitespace(buf, pos, _ws=frozenset(' \t\r\n\ufeff')):
+    # hand-rolled for the same reason as scan_string: the typical run
+    # is a single space or newline, where allocating a match object
+    # costs more than the scan itself; find() skips whole comments
+    size = len(buf)
+    while pos < size:
+        peek = buf[pos]
+        if peek in _ws:
+            pos += 1
+        elif peek == '#':
+            nl = buf.find('\n', pos)
+            if nl == -1:
+                if buf.find('\r', pos) != -1:
+                    break  # a bare '\r' never terminates a comment
+                return size
+            if buf.find('\r', pos, nl - 1) != -1:
+                break
+            pos = nl + 1
+        else:
+            break
+    return pos
+
+
+def scan_string(buf, pos, quote):
+    # hand-rolled scan for the closing quote: find() jumps over whole
+    # unescaped runs at C speed and each escape is checked once, so
+    # scanning stays O(n) with no regex backtracking
+    if quote == "'":
+        reason = "Invalid single quoted string"
+    else:
+        reason = "Invalid double quoted string"
+    p = pos + 1
+    while True:
+        q = buf.find(quote, p)
+        if q < 0:
+            raise ParserErr(buf, pos, reason)
+        bs = buf.find('\\', p, q)
+        if bs < 0:
+            if bad_char_search(buf, p, q):
+                raise ParserErr(buf, pos, reason)
+            return q + 1
+        if bad_char_search(buf, p, bs):
+            raise ParserErr(buf, pos, reason)
+        esc = buf[bs + 1]
+        if esc in str_escapes:
+            p = bs + 2
+        elif esc == 'x' and hex2_match(buf, bs + 2):
+            p = bs + 4
+        elif esc == 'u' and hex4_match(buf, bs + 2):
+            p = bs + 6
+        elif esc == 'U' and hex8_match(buf, bs + 2):
+            p = bs + 10
+        elif esc == '\n':
+            p = bs + 2
+        elif buf[bs + 1:bs + 3] == '\r\n':
+            p = bs + 3
+        else:
+            raise ParserErr(
+                buf, bs, "Unkown escape character {}".format(repr(esc)))
+
+
+class SemanticErr(Exception):
+    pass
+
+
 class ParserErr(Exception):
     def __init__(self, buf, pos, reason=None):
         self.buf = buf
@@ -119,6 +242,37 @@ class ParserErr(Exception):
         Exception.__init__(self, "{} (at pos={})".format(reason, pos))
 
 
+def tag_base64(buf, pos, out):
+    try:
+        return a2b_base64(out)
+    except Exception as e:
+        raise ParserErr(buf, pos, "Invalid base64") from e
+
+
+def tag_datetime(buf, pos, out):
+    try:
+        return parse_datetime(out)
+    except Exception as e:
+        raise ParserErr(
+            buf, pos, "Invalid datetime: {}".format(repr(out))) from e
+
+
+def tag_c99_float(buf, pos, out):
+    if c99_match(out):
+        return float.fromhex(out)
+    raise ParserErr(
+        buf, pos, "invalid C99 float literal: {}".format(out))
+
+
+# reserved tags with string payloads: one hash lookup picks the
+# converter instead of an if/elif ladder of string compares
+string_tag_fns = {
+    'base64': tag_base64,
+    'datetime': tag_datetime,
+    'float': tag_c99_float,
+}
+
+
 class Codec:
     content_type = CONTENT_TYPE
 
@@ -126,14 +280,44 @@ class Codec:
         self.object_to_tagged = object_to_tagged
         self.tagged_to_object = tagged_to_object
 
+        # first character of a scalar picks the handler outright;
+        # containers are handled by the stack loop in parse_rson.
+        # indexed by ord() — a flat list beats a dict probe, and every
+        # unassigned slot falls through to parse_builtin
+        dispatch = [self.parse_builtin] * 128
+        dispatch[ord('"')] = self.parse_string
+        dispatch[ord("'")] = self.parse_string
+        for c in "-+0123456789":
+            dispatch[ord(c)] = self.parse_number
+        self.dispatch = dispatch
+
+        # exact type of a value picks the dumper; subclasses fall back
+        # to an __mro__ walk in find_dumper. dict is inserted before
+        # OrderedDict on purpose: where the two are aliased (3.7+),
+        # the OrderedDict entry wins and plain dicts keep dumping in
+        # insertion order
+        dumpers = {
+            bool: self.dump_builtin,
+            type(None): self.dump_builtin,
+            str: self.dump_string,
+            int: self.dump_int,
+            float: self.dump_float,
+            complex: self.dump_complex,
+            bytes: self.dump_bytes,
+            bytearray: self.dump_bytes,
+            list: self.dump_list,
+            tuple: self.dump_list,
+            set: self.dump_set,
+            datetime: self.dump_datetime,
+            timedelta: self.dump_duration,
+        }
+        dumpers[dict] = self.dump_dict
+        dumpers[OrderedDict] = self.dump_odict
+        self.dumpers = dumpers
+
     def parse(self, buf, transform=None):
         obj, pos = self.parse_rson(buf, 0, transform)
 
-        m = whitespace.match(buf, pos)
-        if m:
-            pos = m.end()
-            m = whitespace.match(buf, pos)
-
         if pos != len(buf):
             raise ParserErr(buf, pos, "Trailing content: {}".format(
                 repr(buf[pos:pos + 10])))
@@ -141,478 +325,572 @@ class Codec:
         return obj
 
 
+    def parse_bytes(self, buf, transform=None):
+        # tokens are all ascii, but decoding the payload once up front
+        # beats parsing bytes in pure python (int indexing, bytes regexes)
+        if isinstance(buf, memoryview):
+            buf = bytes(buf)
+        return self.parse(buf.decode('utf-8'), transform)
+
     def dump(self, obj, transform=None):
-        buf = io.StringIO('')
-        self.dump_rson(obj, buf, transform)
-        return buf.getvalue()
+        # appending fragments to a list and joining once beats paying
+        # a StringIO.write call per token
+        parts = []
+        self.dump_parts(obj, parts.append, transform)
+        return ''.join(parts)
 
     def parse_rson(self, buf, pos, transform=None):
-        m = whitespace.match(buf, pos)
-        if m:
-            pos = m.end()
+        # containers are parsed with an explicit stack rather than by
+        # recursion: nesting costs a list append, not a python frame,
+        # and deeply nested documents don't hit the recursion limit
+        stack = []
+
+        # names the loops touch once or more per token, bound once per
+        # parse: LOAD_FAST beats LOAD_GLOBAL, or a global + attribute
+        # pair in the case of sys.intern and the dispatch table
+        skip_ws = skip_whitespace
+        intern = sys.intern
+        dispatch = self.dispatch
+        parse_builtin = self.parse_builtin
+
+        def close_object(name, out):
+            if name not in (None, 'object', 'record', 'dict'):
+                out = self.tagged_to_object(name, out)
+            if transform is not None:
+                out = transform(out)
+            return out
 
-        peek = buf[pos]
-        name = None
-        if peek == '@':
-            m = tag_name.match(buf, pos)
-            if m:
-                pos = m.end()
-                name = buf[m.start() + 1:pos].rstrip()
-            else:
-                raise ParserErr(buf, pos)
+        def close_list(name, out):
+            if name == 'complex':
+                out = complex(*out)
+            elif name == 'string':
+                out = "".join(out)
+            elif name == 'set':
+                # one C pass builds the set; a shrunken len betrays a
+                # duplicate without a membership probe per element
+                items = set(out)
+                if len(items) != len(out):
+                    seen = set()
+                    for x in out:
+                        if x in seen:
+                            raise SemanticErr(
+                                'duplicate item in set: {}'.format(x))
+                        seen.add(x)
+                out = items
+            elif name not in (None, 'object', 'list'):
+                out = self.tagged_to_object(name, out)
+            if transform is not None:
+                out = transform(out)
+            return out
 
-        peek = buf[pos]
+        while True:
+            # parse the next value, opening containers as they appear
+            while True:
+                pos = skip_ws(buf, pos)
 
-        if peek == '@':
-            raise ParserErr(buf, pos, "Cannot nest tags")
+                peek = buf[pos]
+                name = None
+                if peek == '@':
+                    # scan the tag name by hand: \w drags the regex
+                    # engine through unicode category lookups for what
+                    # is almost always a short run of [a-z]
+                    end = pos + 1
+                    size = len(buf)
+                    while end < size and (buf[end].isalnum() or buf[end] == '_'):
+                        end += 1
+                    if end == pos + 1 or buf[pos + 1].isdecimal():
+                        raise ParserErr(buf, pos)
+                    name = intern(buf[pos + 1:end])
+                    # any whitespace may separate a tag from its value,
+                    # not just literal spaces
+                    ws = skip_ws(buf, end)
+                    if ws == end:
+                        raise ParserErr(buf, pos)
+                    pos = ws
+
+                    peek = buf[pos]
+                    if peek == '@':
+                        raise ParserErr(buf, pos, "Cannot nest tags")
+
+                if peek == '{':
+                    if name not in object_tags and name in reserved_tags:
+                        raise ParserErr(
+                            buf, pos, "{} can't be used on objects".format(name))
 
-        elif peek == '{':
-            if name in reserved_tags:
-                if name not in ('object', 'record', 'dict'):
-                    raise ParserErr(
-                        buf, pos, "{} can't be used on objects".format(name))
+                    if name == 'dict':
+                        out = dict()
+                    else:
+                        # insertion order is guaranteed by plain dict on 3.7+ (see
+                        # the OrderedDict alias up top); the literal skips a call
+                        out = {} if OrderedDict is dict else OrderedDict()
 
-            if name == 'dict':
-                out = dict()
-            else:
-                out = OrderedDict()
+                    pos += 1
+                    pos = skip_ws(buf, pos)
 
-            pos += 1
-            m = whitespace.match(buf, pos)
-            if m:
-                pos = m.end()
+                    if buf[pos] == '}':
+                        pos += 1
+                        out = close_object(name, out)
+                        break
 
-            while buf[pos] != '}':
-                key, pos = self.parse_rson(buf, pos, transform)
+                    stack.append(['{', name, out, None, False])
 
-                if key in out:
-                    raise SemanticErr('duplicate key: {}, {}'.format(key, out))
+                elif peek == '[':
+                    if name not in list_tags and name in reserved_tags:
+                        raise ParserErr(
+                            buf, pos, "{} can't be used on lists".format(name))
 
-                m = whitespace.match(buf, pos)
-                if m:
-                    pos = m.end()
+                    # @set collects into a list too: close_list builds
+                    # the set in one pass and len-checks for duplicates
+                    out = []
+                    insert = out.append
 
-                peek = buf[pos]
-                if peek == ':':
                     pos += 1
-                    m = whitespace.match(buf, pos)
-                    if m:
-                        pos = m.end()
-                else:
-                    raise ParserErr(
-                        buf, pos, "Expected key:value pair but found {}".format(repr(peek)))
-                    
-                item, pos = self.parse_rson(buf, pos, transform)
+                    pos = skip_ws(buf, pos)
 
-                out[key] = item
+                    if buf[pos] == ']':
+                        pos += 1
+                        out = close_list(name, out)
+                        break
 
-                m = whitespace.match(buf, pos)
-                if m:
-                    pos = m.end()
+                    # the bound inserter rides along in the frame so
+                    # each element costs a call, not a lookup + call
+                    stack.append(['[', name, out, insert])
 
-                peek = buf[pos]
-                
-                if peek == ',':
-                    pos += 1
-                    m = whitespace.match(buf, pos)
-                    if m:
-                        pos = m.end()
-                elif peek != '}':
-                    raise ParserErr(
-                        buf, pos, "Expecting a ',', or a '}}' but found {}".format('{}',repr(peek)))
-            if name not in (None, 'object', 'record', 'dict'):
-                out = self.tagged_to_object(name,  out)
-            if transform is not None:
-                out = transform(out)
-            return out, pos + 1
+                else:
+                    i = ord(peek)
+                    if i < 128:
+                        handler = dispatch[i]
+                    else:
+                        handler = parse_builtin
+                    out, pos = handler(buf, pos, name, transform)
+                    break
 
-        elif peek == '[':
-            if name in reserved_tags:
-                if name not in ('object', 'list', 'set', 'complex', 'string',):
-                    raise ParserErr(
-                        buf, pos, "{} can't be used on lists".format(name))
+            # attach the finished value to its parent, closing any
+            # containers that end here; the returned pos is already
+            # past any trailing whitespace so callers needn't re-scan
+            while True:
+                if not stack:
+                    return out, skip_ws(buf, pos)
 
-            if name == 'set':
-                out = set()
-            else:
-                out = []
+                frame = stack[-1]
 
-            pos += 1
+                if frame[0] == '{':
+                    if not frame[4]:
+                        if type(out) is str:
+                            # keys repeat across records: share one str
+                            # object and get pointer-fast hash/compares
+                            out = intern(out)
 
-            m = whitespace.match(buf, pos)
-            if m:
-                pos = m.end()
+                        pos = skip_ws(buf, pos)
+
+                        peek = buf[pos]
+                        if peek != ':':
+                            raise ParserErr(
+                                buf, pos, "Expected key:value pair but found {}".format(repr(peek)))
+                        pos += 1
+
+                        frame[3] = out
+                        frame[4] = True
+                        break
+
+                    # a single insert doubles as the duplicate check:
+                    # overwriting an existing key leaves len unchanged
+                    prev_len = len(frame[2])
+                    frame[2][frame[3]] = out
+                    if len(frame[2]) == prev_len:
+                        raise SemanticErr(
+                            'duplicate key: {}, {}'.format(frame[3], frame[2]))
+                    frame[3] = None
+                    frame[4] = False
+
+                    pos = skip_ws(buf, pos)
+
+                    peek = buf[pos]
+                    if peek == ',':
+                        pos += 1
+                        pos = skip_ws(buf, pos)
+                        peek = buf[pos]
+                    elif peek != '}':
+                        raise ParserErr(
+                            buf, pos, "Expecting a ',', or a '}}' but found {}".format(repr(peek)))
+
+                    if peek == '}':
+                        pos += 1
+                        stack.pop()
+                        out = close_object(frame[1], frame[2])
+                        continue
+                    break
 
-            while buf[pos] != ']':
-                item, pos = self.parse_rson(buf, pos, transform)
-                if name == 'set':
-                    if item in out:
-                        raise SemanticErr('duplicate item in set: {}'.format(item))
-                    else:
-                        out.add(item)
                 else:
-                    out.append(item)
+                    frame[3](out)
 
-                m = whitespace.match(buf, pos)
-                if m:
-                    pos = m.end()
+                    pos = skip_ws(buf, pos)
 
-                peek = buf[pos]
-                if peek == ',':
-                    pos += 1
-                    m = whitespace.match(buf, pos)
-                    if m:
-                        pos = m.end()
-                elif peek != ']':
-                    raise ParserErr(
-                        buf, pos, "Expecting a ',', or a ']' but found {}".format(repr(peek)))
+                    peek = buf[pos]
+                    if peek == ',':
+                        pos += 1
+                        pos = skip_ws(buf, pos)
+                        peek = buf[pos]
+                    elif peek != ']':
+                        raise ParserErr(
+                            buf, pos, "Expecting a ',', or a ']' but found {}".format(repr(peek)))
 
-            pos += 1
+                    if peek == ']':
+                        pos += 1
+                        stack.pop()
+                        out = close_list(frame[1], frame[2])
+                        continue
+                    break
 
-            if name in (None, 'object', 'list', 'set'):
-                pass
-            elif name == 'complex':
-                out = complex(*out)
-            elif name == 'string':
-                out = "".join(out)
-            else:
-                out = self.tagged_to_object(name,  out)
+    def parse_string(self, buf, pos, name, transform=None):
+        peek = buf[pos]
+        if name not in string_tags and name in reserved_tags:
+            raise ParserErr(
+                buf, pos, "{} can't be used on strings".format(name))
 
-            if transform is not None:
-                out = transform(out)
-            return out, pos
+        # validate string
+        end = scan_string(buf, pos, peek)
 
-        elif peek == "'" or peek == '"':
-            if name in reserved_tags:
-                if name not in ('object', 'string', 'float', 'datetime', 'bytestring', 'base64'):
-                    raise ParserErr(
-                        buf, pos, "{} can't be used on strings".format(name))
+        lo = pos + 1  # skip quotes
 
+        if buf.find("\\", lo, end - 1) == -1:
+            # common case: no escapes, the body is a single slice
             if name == 'bytestring':
-                s = bytearray()
-                ascii = True
-            else:
-                s = io.StringIO()
-                ascii = False
-
-            # validate string
-            if peek == "'":
-                m = string_sq.match(buf, pos)
-                if m:
-                    end = m.end()
+                out = bytearray(buf[lo:end - 1].encode('ascii'))
+                if transform is not None:
+                    out = transform(out)
+                return out, end
+            s = buf[lo:end - 1]
+            return self.tag_string(buf, pos, name, s, end, transform)
+
+        if name == 'bytestring':
+            s = bytearray()
+            ascii = True
+        else:
+            s = io.StringIO()
+            ascii = False
+
+        while lo < end - 1:
+            hi = buf.find("\\", lo, end)
+            if hi == -1:
+                if ascii:
+                    s.extend(buf[lo:end - 1].encode('ascii'))
                 else:
-                    raise ParserErr(buf, pos, "Invalid single quoted string")
+                    s.write(buf[lo:end - 1])  # skip quote
+                break
+
+            if ascii:
+                s.extend(buf[lo:hi].encode('ascii'))
             else:
-                m = string_dq.match(buf, pos)
-                if m:
-                    end = m.end()
-                else:
-                    raise ParserErr(buf, pos, "Invalid double quoted string")
-
-            lo = pos + 1  # skip quotes
-            while lo < end - 1:
-                hi = buf.find("\\", lo, end)
-                if hi == -1:
-                    if ascii:
-                        s.extend(buf[lo:end - 1].encode('ascii'))
-                    else:
-                        s.write(buf[lo:end - 1])  # skip quote
-                    break
+                s.write(buf[lo:hi])
 
+            esc = buf[hi + 1]
+            if esc in str_escapes:
                 if ascii:
-                    s.extend(buf[lo:hi].encode('ascii'))
+                    s.extend(byte_escapes[esc])
                 else:
-                    s.write(buf[lo:hi])
-
-                esc = buf[hi + 1]
-                if esc in str_escapes:
-                    if ascii:
-                        s.extend(byte_escapes[esc])
-                    else:
-                        s.write(str_escapes[esc])
-                    lo = hi + 2
-                elif esc == 'x':
-                    n = int(buf[hi + 2:hi + 4], 16)
-                    if ascii:
-                        s.append(n)
-                    else:
-                        s.write(chr(n))
-                    lo = hi + 4
-                elif esc == 'u':
-                    n = int(buf[hi + 2:hi + 6], 16)
-                    if ascii:
-                        if n > 0xFF:
-                            raise ParserErr(
-                                buf, hi, 'bytestring cannot have escape > 255')
-                        s.append(n)
-                    else:
-                        if 0xD800 <= n <= 0xDFFF:
-                            raise ParserErr(
-                                buf, hi, 'string cannot have surrogate pairs')
-                        s.write(chr(n))
-                    lo = hi + 6
-                elif esc == 'U':
-                    n = int(buf[hi + 2:hi + 10], 16)
-                    if ascii:
-                        if n > 0xFF:
-                            raise ParserErr(
-                                buf, hi, 'bytestring cannot have escape > 255')
-                        s.append(n)
-                    else:
-                        if 0xD800 <= n <= 0xDFFF:
-                            raise ParserErr(
-                                buf, hi, 'string cannot have surrogate pairs')
-                        s.write(chr(n))
-                    lo = hi + 10
-                elif esc == '\n':
-                    lo = hi + 2
-                elif (buf[hi + 1:hi + 3] == '\r\n'):
-                    lo = hi + 3
+                    s.write(str_escapes[esc])
+                lo = hi + 2
+            elif esc == 'x':
+                n = int(buf[hi + 2:hi + 4], 16)
+                if ascii:
+                    s.append(n)
                 else:
-                    raise ParserErr(
-                        buf, hi, "Unkown escape character {}".format(repr(esc)))
-
-            if name == 'bytestring':
-                out = s
-            else:
-                out = s.getvalue()
-
-                if name in (None, 'string', 'object'):
-                    pass
-                elif name == 'base64':
-                    try:
-                        out = base64.standard_b64decode(out)
-                    except Exception as e:
-                        raise ParserErr(buf, pos, "Invalid base64") from e
-                elif name == 'datetime':
-                    try:
-                        out = parse_datetime(out)
-                    except Exception as e:
+                    s.write(chr(n))
+                lo = hi + 4
+            elif esc == 'u':
+                n = int(buf[hi + 2:hi + 6], 16)
+                if ascii:
+                    if n > 0xFF:
                         raise ParserErr(
-                            buf, pos, "Invalid datetime: {}".format(repr(out))) from e
-                elif name == 'float':
-                    m = c99_flt.match(out)
-                    if m:
-                        out = float.fromhex(out)
-                    else:
+                            buf, hi, 'bytestring cannot have escape > 255')
+                    s.append(n)
+                else:
+                    if 0xD800 <= n <= 0xDFFF:
+                        raise ParserErr(
+                            buf, hi, 'string cannot have surrogate pairs')
+                    s.write(chr(n))
+                lo = hi + 6
+            elif esc == 'U':
+                n = int(buf[hi + 2:hi + 10], 16)
+                if ascii:
+                    if n > 0xFF:
                         raise ParserErr(
-                            buf, pos, "invalid C99 float literal: {}".format(out))
+                            buf, hi, 'bytestring cannot have escape > 255')
+                    s.append(n)
                 else:
-                    out = self.tagged_to_object(name,  out)
+                    if 0xD800 <= n <= 0xDFFF:
+                        raise ParserErr(
+                            buf, hi, 'string cannot have surrogate pairs')
+                    s.write(chr(n))
+                lo = hi + 10
+            elif esc == '\n':
+                lo = hi + 2
+            elif (buf[hi + 1:hi + 3] == '\r\n'):
+                lo = hi + 3
+            else:
+                raise ParserErr(
+                    buf, hi, "Unkown escape character {}".format(repr(esc)))
 
+        if name == 'bytestring':
+            out = s
             if transform is not None:
                 out = transform(out)
             return out, end
 
-        elif peek in "-+0123456789":
-            if name in reserved_tags:
-                if name not in ('object', 'int', 'float', 'duration'):
-                    raise ParserErr(
-                        buf, pos, "{} can't be used on numbers".format(name))
-
-            flt_end = None
-            exp_end = None
-
-            sign = +1
-
-            if buf[pos] in "+-":
-                if buf[pos] == "-":
-                    sign = -1
-                pos += 1
-            peek = buf[pos:pos + 2]
-
-            if peek in ('0x', '0o', '0b'):
-                if peek == '0x':
-                    base = 16
-                    m = int_b16.match(buf, pos)
-                    if m:
-                        end = m.end()
-                    else:
-                        raise ParserErr(
-                            buf, pos, "Invalid hexadecimal number (0x...)")
-                elif peek == '0o':
-                    base = 8
-                    m = int_b8.match(buf, pos)
-                    if m:
-                        end = m.end()
-                    else:
-                        raise ParserErr(buf, pos, "Invalid octal number (0o...)")
-                elif peek == '0b':
-                    base = 2
-                    m = int_b2.match(buf, pos)
-                    if m:
-                        end = m.end()
-                    else:
-                        raise ParserErr(
-                            buf, pos, "Invalid hexadecimal number (0x...)")
+        return self.tag_string(buf, pos, name, s.getvalue(), end, transform)
 
-                out = sign * int(buf[pos + 2:end].replace('_', ''), base)
+    def tag_string(self, buf, pos, name, out, end, transform=None):
+        if name is not None and name != 'string' and name != 'object':
+            fn = string_tag_fns.get(name)
+            if fn is not None:
+                out = fn(buf, pos, out)
             else:
-                m = int_b10.match(buf, pos)
-                if m:
-                    int_end = m.end()
-                    end = int_end
-                else:
-                    raise ParserErr(buf, pos, "Invalid number")
+                out = self.tagged_to_object(name,  out)
 
-                t = flt_b10.match(buf, end)
-                if t:
-                    flt_end = t.end()
-                    end = flt_end
+        if transform is not None:
+            out = transform(out)
+        return out, end
 
-                e = exp_b10.match(buf, end)
-                if e:
-                    exp_end = e.end()
-                    end = exp_end
+    def parse_number(self, buf, pos, name, transform=None):
+        if name not in number_tags and name in reserved_tags:
+            raise ParserErr(
+                buf, pos, "{} can't be used on numbers".format(name))
 
-                if flt_end or exp_end:
-                    out = sign * float(buf[pos:end].replace('_', ''))
-                else:
-                    out = sign * int(buf[pos:end].replace('_', ''), 10)
-
-            if name is None or name == 'object':
-                pass
-            elif name == 'duration':
-                out = timedelta(seconds=out)
-            elif name == 'int':
-                if flt_end or exp_end:
-                    raise ParserErr(
-                        buf, pos, "Can't tag floating point with @int")
-            elif name == 'float':
-                if not isintance(out, float):
-                    out = float(out)
-            else:
-                out = self.tagged_to_object(name, out)
+        flt_end = None
+        exp_end = None
 
-            if transform is not None:
-                out = transform(out)
-            return out, end
+        sign = +1
 
+        if buf[pos] in "+-":
+            if buf[pos] == "-":
+                sign = -1
+            pos += 1
+        m = num_match(buf, pos)
+        if m is None:
+            raise ParserErr(buf, pos, "Invalid number")
+        end = m.end()
+
+        base = radix_group.get(m.lastgroup)
+        if base is not None:
+            s = m.group(m.lastgroup)
+            if '_' in s:
+                s = s.replace('_', '')
+            out = sign * int(s, base)
         else:
-            m = identifier.match(buf, pos)
-            if m:
-                end = m.end()
-                item = buf[pos:end]
+            # a bare '0' in front of a radix letter means the radix
+            # digits were missing or malformed
+            nxt = buf[end:end + 1]
+            if end == pos + 1 and nxt in radix_err:
+                raise ParserErr(buf, pos, radix_err[nxt])
+
+            if m.group('frac') is not None:
+                flt_end = m.end('frac')
+            if m.group('exp') is not None:
+                exp_end = m.end('exp')
+
+            s = buf[pos:end]
+            if '_' in s:
+                s = s.replace('_', '')
+            if flt_end or exp_end:
+                out = sign * float(s)
             else:
-                raise ParserErr(buf, pos)
-
-            if item not in builtin_names:
+                out = sign * int(s, 10)
+
+        if name is None or name == 'object':
+            pass
+        elif name == 'duration':
+            out = timedelta(seconds=out)
+        elif name == 'int':
+            if flt_end or exp_end:
                 raise ParserErr(
-                    buf, pos, "{} is not a recognised built-in".format(repr(item)))
-
-            out = builtin_names[item]
-
-            if name is None or name == 'object':
-                pass
-            elif name == 'bool':
-                if item not in ('true', 'false'):
-                    raise ParserErr(buf, pos, '@bool can only true or false')
-            elif name in reserved_tags:
-                raise ParserErr(
-                    buf, pos, "{} has no meaning for {}".format(repr(name), item))
-            else:
-                out = self.tagged_to_object(name,  out)
-
-            if transform is not None:
-                out = transform(out)
-            return out, end
+                    buf, pos, "Can't tag floating point with @int")
+        elif name == 'float':
+            if not isintance(out, float):
+                out = float(out)
+        else:
+            out = self.tagged_to_object(name, out)
 
-        raise ParserErr(buf, pos)
+        if transform is not None:
+            out = transform(out)
+        return out, end
 
+    def parse_builtin(self, buf, pos, name, transform=None):
+        m = ident_match(buf, pos)
+        if m:
+            end = m.end()
+            item = buf[pos:end]
+        else:
+            raise ParserErr(buf, pos)
+
+        if item not in builtin_names:
+            raise ParserErr(
+                buf, pos, "{} is not a recognised built-in".format(repr(item)))
+
+        out = builtin_names[item]
+
+        if name is None or name == 'object':
+            pass
+        elif name == 'bool':
+            if item not in ('true', 'false'):
+                raise ParserErr(buf, pos, '@bool can only true or false')
+        elif name in reserved_tags:
+            raise ParserErr(
+                buf, pos, "{} has no meaning for {}".format(repr(name), item))
+        else:
+            out = self.tagged_to_object(name,  out)
 
+        if transform is not None:
+            out = transform(out)
+        return out, end
 
     def dump_rson(self, obj, buf, transform=None):
-        if transform:
-            obj = transform(obj)
-        if obj is True or obj is False or obj is None:
-            buf.write(builtin_values[obj])
-        elif isinstance(obj, str):
-            buf.write('"')
-            for c in obj:
-                if c in escaped:
-                    buf.write(escaped[c])
-                elif ord(c) < 0x20:
-                    buf.write('\\x{:02X}'.format(ord(c)))
-                else:
-                    buf.write(c)
-            buf.write('"')
-        elif isinstance(obj, int):
-            buf.write(str(obj))
-        elif isinstance(obj, float):
-            hex = obj.hex()
-            if hex.startswith(('0', '-')):
-                buf.write(str(obj))
-            else:
-                buf.write('@float "{}"'.format(hex))
-        elif isinstance(obj, complex):
-            buf.write("@complex [{}, {}]".format(obj.real, obj.imag))
-        elif isinstance(obj, (bytes, bytearray)):
-            buf.write('@base64 "')
-            # assume no escaping needed
-            buf.write(base64.standard_b64encode(obj).decode('ascii'))
-            buf.write('"')
-        elif isinstance(obj, (list, tuple)):
-            buf.write('[')
-            first = True
-            for x in obj:
-                if first:
-                    first = False
-                else:
-                    buf.write(", ")
-                self.dump_rson(x, buf, transform)
-            buf.write(']')
-        elif isinstance(obj, set):
-            buf.write('@set [')
-            first = True
-            for x in obj:
-                if first:
-                    first = False
-                else:
-                    buf.write(", ")
-                self.dump_rson(x, buf, transform)
-            buf.write(']')
-        elif isinstance(obj, OrderedDict): # must be before dict
-            buf.write('{')
-            first = True
-            for k, v in obj.items():
-                if first:
-                    first = False
-                else:
-                    buf.write(", ")
-                self.dump_rson(k, buf, transform)
-                buf.write(": ")
-                self.dump_rson(v, buf, transform)
-            buf.write('}')
-        elif isinstance(obj, dict):
-            buf.write('@dict {')
-            first = True
-            for k in sorted(obj.keys()):
-                if first:
-                    first = False
-                else:
-                    buf.write(", ")
-                self.dump_rson(k, buf, transform)
-                buf.write(": ")
-                self.dump_rson(obj[k], buf, transform)
-            buf.write('}')
-        elif isinstance(obj, datetime):
-            buf.write('@datetime "{}"'.format(format_datetime(obj)))
-        elif isinstance(obj, timedelta):
-            buf.write('@duration {}'.format(obj.total_seconds()))
+        self.dump_parts(obj, buf.write, transform)
+
+    def dump_parts(self, obj, write, transform=None):
+        # like parse_rson, containers are walked with an explicit stack
+        # rather than by recursion: each pending entry is either a
+        # literal piece of output or a value still to be dumped;
+        # write is any callable taking one string (list.append works)
+        dumpers = self.dumpers
+        stack = [(False, obj)]
+        while stack:
+            is_text, obj = stack.pop()
+            if is_text:
+                write(obj)
+                continue
+            if transform:
+                obj = transform(obj)
+            handler = dumpers.get(obj.__class__)
+            if handler is None:
+                handler = self.find_dumper(obj)
+            handler(obj, write, stack)
+
+    def find_dumper(self, obj):
+        # subclasses (namedtuples, user dict types, ...) dump like
+        # their nearest base; anything unrelated must be tagged
+        for klass in type(obj).__mro__:
+            handler = self.dumpers.get(klass)
+            if handler is not None:
+                return handler
+        return self.dump_tagged
+
+    def dump_builtin(self, obj, write, stack):
+        write(builtin_values[obj])
+
+    def dump_string(self, obj, write, stack):
+        write('"')
+        write(obj.translate(escape_table))
+        write('"')
+
+    def dump_int(self, obj, write, stack):
+        write(str(obj))
+
+    def dump_float(self, obj, write, stack):
+        hex = obj.hex()
+        if hex.startswith(('0', '-')):
+            write(str(obj))
         else:
-            nv = self.object_to_tagged(obj)
-            name, value = nv
-            if not isinstance(value, OrderedDict) and isinstance(value, dict):
-                value = OrderedDict(value)
-            buf.write('@{} '.format(name))
-            self.dump_rson(value, buf, transform)  # XXX: prevent @foo @foo
+            write('@float "{}"'.format(hex))
+
+    def dump_complex(self, obj, write, stack):
+        write("@complex [{}, {}]".format(obj.real, obj.imag))
+
+    def dump_bytes(self, obj, write, stack):
+        write('@base64 "')
+        # assume no escaping needed; b2a_base64 is the C routine the
+        # base64 wrappers call, minus a frame and the newline strip
+        write(b2a_base64(obj, newline=False).decode('ascii'))
+        write('"')
+
+    def dump_list(self, obj, write, stack):
+        write('[')
+        stack.append((True, ']'))
+        for x in reversed(obj):
+            stack.append((False, x))
+            stack.append((True, ", "))
+        if obj:
+            # a separator was pushed after every element; the topmost
+            # one would print before the first element, so drop it
+            stack.pop()
+
+    def dump_set(self, obj, write, stack):
+        write('@set [')
+        stack.append((True, ']'))
+        for x in reversed(list(obj)):
+            stack.append((False, x))
+            stack.append((True, ", "))
+        if obj:
+            stack.pop()
+
+    def dump_odict(self, obj, write, stack):
+        write('{')
+        stack.append((True, '}'))
+        for k, v in reversed(list(obj.items())):
+            stack.append((False, v))
+            stack.append((True, ": "))
+            stack.append((False, k))
+            stack.append((True, ", "))
+        if obj:
+            stack.pop()
+
+    def dump_dict(self, obj, write, stack):
+        write('@dict {')
+        stack.append((True, '}'))
+        for k, v in reversed(sorted(obj.items(), key=_getkey)):
+            stack.append((False, v))
+            stack.append((True, ": "))
+            stack.append((False, k))
+            stack.append((True, ", "))
+        if obj:
+            stack.pop()
+
+    def dump_datetime(self, obj, write, stack):
+        write('@datetime "{}"'.format(format_datetime(obj)))
+
+    def dump_duration(self, obj, write, stack):
+        write('@duration {}'.format(obj.total_seconds()))
+
+    def dump_tagged(self, obj, write, stack):
+        nv = self.object_to_tagged(obj)
+        name, value = nv
+        if not isinstance(value, OrderedDict) and isinstance(value, dict):
+            value = OrderedDict(value)
+        write('@{} '.format(name))
+        stack.append((False, value))  # XXX: prevent @foo @foo
 
 codec = Codec(None, None)
 
 parse = codec.parse
+parse_bytes = codec.parse_bytes
 dump = codec.dump
 
 
+def _freeze(obj):
+    # cached results are shared between callers, so every mutable
+    # container is swapped for a read-only equivalent
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(x) for x in obj)
+    if isinstance(obj, set):
+        return frozenset(obj)
+    if isinstance(obj, bytearray):
+        return bytes(obj)
+    return obj
+
+
+@functools.lru_cache(maxsize=256)
+def parse_cached(buf):
+    """parse for payloads that repeat, like config or protocol
+    messages: identical input skips the parser entirely. the result is
+    frozen (dicts become mapping proxies, lists tuples, sets
+    frozensets) so cache hits can be handed out safely; callers that
+    want to mutate the result should use parse. hit rates are visible
+    via parse_cached.cache_info()"""
+    return _freeze(parse(buf))
+
+
 def run_tests(parse, dump):
     def test_parse(buf, obj):
         out = parse(buf)
@@ -665,6 +943,9 @@ def run_tests(parse, dump):
 b"        
     """, "ab")
     test_parse("0.0", 0.0)
+    test_parse("1e10", 1e10)
+    test_parse("1.5e-2", 1.5e-2)
+    test_parse("1_0.2_5", 10.25)
     test_parse("-0.0", -0.0)
     test_parse("'foo'", "foo")
     test_parse(r"'fo\no'", "fo\no")
@@ -696,11 +977,31 @@ b"
     test_parse("@bytestring 'fo\x20o'", b"fo o")
     test_parse("@float '{}'".format((3000000.0).hex()), 3000000.0)
     test_parse(hex(123), 123)
+    test_parse("@int\t1", 1)
+    test_parse("@int #comment\n 1", 1)
     test_parse('@object "foo"', "foo")
     test_parse('@object 12', 12)
 
     test_dump(1, "1")
 
+    # deeper than the default recursion limit
+    deep = '[' * 1100 + ']' * 1100
+    out = parse(deep)
+    depth = 1
+    while out:
+        out = out[0]
+        depth += 1
+    if depth != 1100:
+        raise AssertionError('deep nesting failed: {}'.format(depth))
+    test_dump(parse(deep), deep)
+
+    if parse_bytes(b"[1, 2, 3]") != [1, 2, 3]:
+        raise AssertionError('parse_bytes failed')
+    if parse_bytes("'café'".encode('utf-8')) != "café":
+        raise AssertionError('parse_bytes failed')
+    if parse_bytes(memoryview(b"{'a': 1}")) != dict(a=1):
+        raise AssertionError('parse_bytes failed')
+
     test_parse_err('"foo', ParserErr)
     test_parse_err('"\uD800\uDD01"', ParserErr)
     test_parse_err(r'"\uD800\uDD01"', ParserErr)